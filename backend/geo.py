@@ -0,0 +1,90 @@
+"""Distance helpers for nearby-event ranking.
+
+Pure NumPy (plus optional Numba) so they can be used and tested without the
+web app's database and API dependencies.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; distances fall back to the NumPy kernel
+    njit = None
+
+EARTH_RADIUS_KM = 6371
+# MongoDB measures GeoJSON distances on a sphere of this radius
+MONGO_EARTH_RADIUS_KM = 6378.1
+DEG2RAD = math.pi / 180
+
+def make_distance_from(lat0, lng0):
+    """Return a Haversine distance function (km) with the origin's trig precomputed"""
+    lat0_rad = lat0 * DEG2RAD
+    lng0_rad = lng0 * DEG2RAD
+    cos_lat0 = math.cos(lat0_rad)
+
+    def dist_from(lats, lngs):
+        lats_rad = np.radians(lats)
+        a = np.sin((lats_rad - lat0_rad) * 0.5)**2 + cos_lat0 * np.cos(lats_rad) * np.sin((np.radians(lngs) - lng0_rad) * 0.5)**2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    return dist_from
+
+def _equirect_km(lat1, lng1, lat2, lng2):
+    """Equirectangular distance approximation in km, accurate at city scale"""
+    # Wrap the longitude difference into [-180, 180) so pairs across the antimeridian stay close
+    dlng = ((lng2 - lng1 + 180) % 360) - 180
+    x = dlng * DEG2RAD * np.cos((lat1 + lat2) * 0.5 * DEG2RAD)
+    y = (lat2 - lat1) * DEG2RAD
+    return EARTH_RADIUS_KM * np.sqrt(x * x + y * y)
+
+def to_geo_point(latitude, longitude):
+    """Build a GeoJSON Point for the 2dsphere index (GeoJSON is [lng, lat])"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+# Below this many points the prefiltered NumPy path beats spinning up Numba's thread pool
+NUMBA_MIN_BATCH = 1000
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def haversine_batch(lat0, lng0, lats, lngs, out):
+        """Fused Haversine loop writing km distances from (lat0, lng0) into out"""
+        lat0_rad = lat0 * DEG2RAD
+        lng0_rad = lng0 * DEG2RAD
+        cos_lat0 = math.cos(lat0_rad)
+        for i in prange(lats.shape[0]):
+            lat_rad = lats[i] * DEG2RAD
+            a = math.sin((lat_rad - lat0_rad) * 0.5)**2 + cos_lat0 * math.cos(lat_rad) * math.sin((lngs[i] * DEG2RAD - lng0_rad) * 0.5)**2
+            out[i] = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+else:
+    haversine_batch = None
+
+def warm_up_distance_kernel():
+    """Compile haversine_batch ahead of the first large request"""
+    if haversine_batch is not None:
+        points = np.zeros(1, dtype=np.float64)
+        haversine_batch(0.0, 0.0, points, points, np.empty_like(points))
+
+def rank_nearby(lat, lng, radius, lats, lngs, limit=None):
+    """Return (indices, distances) of points within radius km, closest first"""
+    if haversine_batch is not None and lats.shape[0] >= NUMBA_MIN_BATCH:
+        distances = np.empty_like(lats)
+        haversine_batch(lat, lng, lats, lngs, distances)
+        candidates = np.where(distances <= radius)[0]
+        distances = distances[candidates]
+    else:
+        # Cheap prefilter (2% margin for approximation error), exact Haversine on survivors only
+        candidates = np.where(_equirect_km(lat, lng, lats, lngs) <= radius * 1.02)[0]
+        dist_from = make_distance_from(lat, lng)
+        distances = dist_from(lats[candidates], lngs[candidates])
+
+    within = distances <= radius
+    candidates, distances = candidates[within], distances[within]
+    order = np.argsort(distances, kind="stable")[:limit]
+    return candidates[order], distances[order]
+
+def coordinate_arrays(events):
+    """Contiguous float64 latitude and longitude arrays for a list of events"""
+    lats = np.fromiter((event['latitude'] for event in events), dtype=np.float64, count=len(events))
+    lngs = np.fromiter((event['longitude'] for event in events), dtype=np.float64, count=len(events))
+    return lats, lngs
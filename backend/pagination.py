@@ -0,0 +1,27 @@
+"""Cursor pagination over events, newest first.
+
+Events are ordered by (created_at, id) descending. Documents without a
+created_at (written out of band) sort after every timestamped event, as
+MongoDB orders missing/null below strings.
+"""
+
+EVENTS_ORDER = [("created_at", -1), ("id", -1)]
+
+def encode_events_cursor(event):
+    """Opaque cursor pointing just past this event in EVENTS_ORDER"""
+    return f"{event.get('created_at') or ''}|{event['id']}"
+
+def events_after_cursor(cursor):
+    """Query matching events strictly after the cursor; raises ValueError if malformed"""
+    created_at, sep, event_id = cursor.rpartition("|")
+    if not sep or not event_id:
+        raise ValueError("Invalid cursor")
+
+    if not created_at:
+        # The cursor sits among the untimestamped events at the end of the order
+        return {"created_at": None, "id": {"$lt": event_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": event_id}},
+        {"created_at": None}
+    ]}
@@ -1,19 +1,39 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import os
 from dotenv import load_dotenv
 import uuid
-from datetime import datetime, timedelta
-import math
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from datetime import datetime, timedelta, timezone
+import json
+import time
+import hashlib
+import logging
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+import redis.asyncio as aioredis
+from openai import NOT_GIVEN, AsyncOpenAI
+from geo import (
+    EARTH_RADIUS_KM,
+    MONGO_EARTH_RADIUS_KM,
+    coordinate_arrays,
+    rank_nearby,
+    to_geo_point,
+    warm_up_distance_kernel
+)
+from pagination import EVENTS_ORDER, encode_events_cursor, events_after_cursor
 import asyncio
 
 load_dotenv()
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -26,7 +46,7 @@ app.add_middleware(
 
 # MongoDB connection
 MONGO_URL = os.environ.get('MONGO_URL')
-client = MongoClient(MONGO_URL)
+client = AsyncIOMotorClient(MONGO_URL, maxPoolSize=50)
 db = client.hyperlocal_events
 
 # Collections
@@ -34,8 +54,116 @@ events_collection = db.events
 chats_collection = db.chats
 messages_collection = db.messages
 
+# Fields never returned to API clients
+EVENT_PROJECTION = {"_id": 0, "location_geo": 0}
+# Minimal fields needed to rank events by distance
+RANKING_PROJECTION = {"_id": 0, "id": 1, "latitude": 1, "longitude": 1}
+
 # OpenAI API Key
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+# One client for the whole process so requests reuse warm keep-alive connections.
+# Built on first use so a missing key only breaks the chat endpoints, not the whole API.
+_openai_client = None
+
+def get_openai_client():
+    """Return the shared AsyncOpenAI client, creating it on first use"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=30, max_retries=2)
+    return _openai_client
+
+# Chat response cache: exact matches in Redis (optional), semantic matches in-process
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = aioredis.from_url(REDIS_URL, decode_responses=True) if REDIS_URL else None
+
+CHAT_CACHE_TTL = 15 * 60  # seconds
+# Unset keeps the API's default sampling temperature. Replies are only reusable when
+# decoding is deterministic (a sampled reply is one draw among many and must not be
+# replayed to other users), so the response cache is opt-in via CHAT_TEMPERATURE=0.
+CHAT_TEMPERATURE = float(os.environ['CHAT_TEMPERATURE']) if os.environ.get('CHAT_TEMPERATURE') else NOT_GIVEN
+CHAT_CACHE_ENABLED = CHAT_TEMPERATURE == 0
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_SIZE = 500
+# The semantic layer is best-effort: give up quickly rather than delay the LLM call
+EMBEDDING_TIMEOUT = 2.0  # seconds
+
+# Entries are (context_key, unit embedding, response, expires_at)
+semantic_cache = deque(maxlen=SEMANTIC_CACHE_SIZE)
+
+# Static system prompt. Keep it free of per-request data: OpenAI caches prompt
+# prefixes of 1024+ tokens automatically, but only on an exact byte match.
+STATIC_SYSTEM_PROMPT = """You are a helpful hyperlocal events assistant. Help users discover local events based on their location and preferences.
+
+Each request comes as two user messages.
+
+The first is a JSON object {"events": [...]} listing up to ten events near the user, sorted from closest to farthest. Each event uses short keys:
+- t: event title
+- c: category
+- d: date and time
+- v: venue
+- km: distance from the user in kilometers
+- p: price
+
+The second is a short request summary:
+- User's message: what the user actually asked. Answer this.
+- User's location: "Provided" if the app shared the user's coordinates, otherwise "Not provided".
+- User's preferences: event categories the user picked in the app, or "Not specified".
+
+Provide helpful, friendly responses about local events. If the user asks about events:
+1. Recommend relevant events based on their preferences and location
+2. Keep each recommendation to a single short line
+3. Mention practical details like distance, date, and price
+4. Ask follow-up questions to better understand their interests
+
+If no location is provided, politely ask for their location to provide better recommendations.
+Keep responses conversational and helpful.
+
+Recommendation guidelines:
+- Only recommend events that appear in the events list. Never invent events, venues, dates, prices or organizers.
+- If the list is empty and a location was provided, say that nothing is currently listed nearby, and suggest widening the search, checking back later, or adding an event through the app.
+- When preferences are specified, lead with events in those categories. Mention other nearby events only if they are a close fit or nothing in the preferred categories is available.
+- When the user names a category, day, time of day or price range in their message, treat it as more important than their saved preferences.
+- Prefer closer events when two events are otherwise an equally good match, and say how far away each recommended event is.
+- Recommend at most three events in a single reply unless the user explicitly asks for more.
+- Do not embellish events with details that are not in the list.
+- State the price exactly as listed. If an event is listed as "Free", say it is free.
+- State dates and times exactly as listed. Do not convert time zones and do not guess the day of the week.
+
+Follow-up policy:
+- End with at most one short follow-up question, and only when the answer would help you narrow down recommendations (for example: preferred day, budget, indoor or outdoor, travelling with kids).
+- Do not ask for information the user has already given in this request.
+- If the user's message is a greeting or small talk, respond briefly and invite them to say what kind of events they are looking for.
+
+Location policy:
+- You never see the user's exact coordinates, only whether a location was shared and the distances to events. Do not claim to know the user's address or neighbourhood.
+- If no location was provided, do not list distances. Ask the user to enable location sharing in the app so you can find events near them.
+
+Handling common requests:
+- "What's happening near me?" or similar: pick the closest events that match the user's preferences and give a quick overview.
+- "What's on this weekend / tonight / tomorrow?": only mention events whose listed date fits. If you cannot tell which dates match, list the dates you have and let the user decide.
+- "Anything free?" or a budget limit: only recommend events whose listed price fits, and say so when none do.
+- "Something for kids / families": favour events whose title or category suggests families, kids or all ages, and be clear when suitability is not stated.
+- "Tell me more about <event>": give the listed details for that event (date, time, venue, price, distance) and suggest asking the organizer for anything else.
+- Questions about getting there: mention the distance and suggest checking a maps app for directions. Do not invent transit routes or parking details.
+- Requests to book, buy tickets or register: explain that you cannot book anything and suggest contacting the organizer named in the app.
+- Requests to add or promote an event: explain that events can be added with the "Add Event" button in the app.
+
+Scope and safety:
+- Stay focused on local events, activities and practical questions about attending them (getting there, what to bring, whether tickets are needed, suitability for children).
+- If the user asks about something unrelated to local events, answer briefly if it is harmless and steer the conversation back to events.
+- Do not give medical, legal or financial advice. For wellness or fitness events, you may describe the activity but suggest checking with the organizer about accessibility or health requirements.
+- Do not share or ask for personal data such as phone numbers, email addresses or payment details.
+- If event details look incomplete or contradictory, say so and suggest confirming with the organizer.
+
+Length and format:
+- Respond in 80 words or fewer. No preamble, no closing pleasantries, no restating the question.
+- One short bullet per event: title — Xkm — date — price.
+- Be warm and upbeat, but concise. Write in plain language without marketing hype.
+- Do not use tables, headings or code blocks.
+- Use the event titles exactly as listed so the user can find them in the app.
+- Reply in the same language the user writes in.
+"""
 
 class Event(BaseModel):
     id: Optional[str] = None
@@ -46,8 +174,8 @@ class Event(BaseModel):
     time: str
     location: str
     address: str
-    latitude: float
-    longitude: float
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
     organizer: str
     price: Optional[str] = "Free"
     image_url: Optional[str] = None
@@ -62,22 +190,114 @@ class ChatResponse(BaseModel):
     response: str
     recommended_events: List[dict] = []
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+# Compile the Numba distance kernel at startup instead of on the first large request
+app.add_event_handler("startup", warm_up_distance_kernel)
+
+async def find_nearby_events(lat, lng, radius, limit=None):
+    """Return up to limit events within radius km of (lat, lng), closest first"""
+    # Readers take a local reference; writers only ever swap the whole snapshot
+    snapshot = EVENTS_SNAPSHOT
+    if snapshot is None:
+        return await find_nearby_events_in_db(lat, lng, radius, limit)
+
+    indices, distances = rank_nearby(lat, lng, radius, snapshot["lats"], snapshot["lngs"], limit)
+    rows = snapshot["rows"]
+    return [
+        {**rows[i], "distance": round(float(distance), 2)}
+        for i, distance in zip(indices, distances)
+    ]
+
+async def find_nearby_events_in_db(lat, lng, radius, limit=None):
+    """Nearby lookup through the 2dsphere index, used until the snapshot is loaded"""
+    # Rank on coordinates only, then hydrate the few events we actually return
+    events = await events_collection.find(
+        {
+            "location_geo": {
+                "$nearSphere": {
+                    "$geometry": to_geo_point(lat, lng),
+                    # Mongo's larger sphere makes its cut stricter than ours; pad it so no
+                    # event within radius by our measure is dropped
+                    "$maxDistance": radius * 1000 * MONGO_EARTH_RADIUS_KM / EARTH_RADIUS_KM
+                }
+            }
+        },
+        RANKING_PROJECTION
+    ).to_list(length=None)
+    if not events:
+        return []
+
+    lats, lngs = coordinate_arrays(events)
+
+    # The padded $maxDistance lets a few events just past radius through; re-apply it in our units
+    indices, distances = rank_nearby(lat, lng, radius, lats, lngs, limit)
+    nearby_distances = {
+        events[i]['id']: round(float(distance), 2)
+        for i, distance in zip(indices, distances)
+    }
+    if not nearby_distances:
+        return []
+
+    nearby_events = await events_collection.find(
+        {"id": {"$in": list(nearby_distances)}}, EVENT_PROJECTION
+    ).to_list(length=None)
+    for event in nearby_events:
+        event['distance'] = nearby_distances[event['id']]
+    nearby_events.sort(key=lambda x: x['distance'])
+    return nearby_events
+
+# In-process snapshot of all events so nearby/chat reads skip MongoDB entirely.
+# None until the first refresh; rebuilt after every write and every EVENTS_SNAPSHOT_TTL.
+EVENTS_SNAPSHOT = None
+EVENTS_SNAPSHOT_TTL = 30  # seconds
+events_version = 0
+
+async def refresh_snapshot():
+    """Reload all events from MongoDB and swap in a new snapshot"""
+    global EVENTS_SNAPSHOT
+    version = events_version
+    rows = await events_collection.find({}, EVENT_PROJECTION).to_list(length=None)
+
+    # A refresh started after a later write may already have landed
+    current = EVENTS_SNAPSHOT
+    if current is not None and current["version"] > version:
+        return
+
+    lats, lngs = coordinate_arrays(rows)
+    EVENTS_SNAPSHOT = {"version": version, "rows": rows, "lats": lats, "lngs": lngs}
+
+def mark_events_changed():
+    """Bump the events version and rebuild the snapshot in the background"""
+    global events_version
+    events_version += 1
+    run_in_background(refresh_snapshot(), name="refresh_events_snapshot")
+
+async def refresh_snapshot_periodically():
+    """Pick up out-of-band writes (other workers, manual edits) on a fixed interval"""
+    while True:
+        try:
+            await refresh_snapshot()
+        except Exception as e:
+            logger.warning("Events snapshot refresh failed: %s", e)
+        await asyncio.sleep(EVENTS_SNAPSHOT_TTL)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+background_tasks = set()
+# Tasks that only read, and are safe to cancel outright at shutdown
+SNAPSHOT_TASK_NAMES = {"events_snapshot", "refresh_events_snapshot"}
+# How long shutdown waits for in-flight background writes
+SHUTDOWN_GRACE_PERIOD = 5  # seconds
+
+def _on_background_task_done(task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task %s failed", task.get_name(), exc_info=task.exception())
+
+def run_in_background(coro, name=None):
+    """Schedule a coroutine off the response path, logging instead of raising on failure"""
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
 
 @app.get("/api/health")
 async def health_check():
@@ -88,128 +308,293 @@ async def create_event(event: Event):
     try:
         event_data = event.dict()
         event_data['id'] = str(uuid.uuid4())
-        event_data['created_at'] = datetime.now().isoformat()
+        event_data['created_at'] = datetime.now(timezone.utc).isoformat()
+        event_data['location_geo'] = to_geo_point(event.latitude, event.longitude)
         
-        events_collection.insert_one(event_data)
+        await events_collection.insert_one(event_data)
+        mark_events_changed()
         return {"message": "Event created successfully", "id": event_data['id']}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/events")
-async def get_events():
+async def get_events(limit: int = Query(50, ge=1, le=200), after: Optional[str] = None):
+    """Page through events newest first; pass next_cursor back as after"""
+    try:
+        query = events_after_cursor(after) if after else {}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
-        events = list(events_collection.find({}, {"_id": 0}))
-        return events
+        events = await events_collection.find(query, EVENT_PROJECTION).sort(EVENTS_ORDER).limit(limit).to_list(length=None)
+        next_cursor = encode_events_cursor(events[-1]) if len(events) == limit else None
+        return {"items": events, "next_cursor": next_cursor}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/events/nearby")
-async def get_nearby_events(lat: float, lng: float, radius: float = 10.0):
+async def get_nearby_events(lat: float, lng: float, radius: float = 10.0, limit: int = Query(50, ge=1, le=200)):
     try:
-        events = list(events_collection.find({}, {"_id": 0}))
-        nearby_events = []
-        
-        for event in events:
-            distance = calculate_distance(lat, lng, event['latitude'], event['longitude'])
-            if distance <= radius:
-                event['distance'] = round(distance, 2)
-                nearby_events.append(event)
-        
-        # Sort by distance
-        nearby_events.sort(key=lambda x: x['distance'])
-        return nearby_events
+        return await find_nearby_events(lat, lng, radius, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def chat_cache_context(user_lat, user_lng, user_preferences, nearby_events):
+    """Serialize the non-message parts of a chat request that shape the reply"""
+    # The event ids tie a cached reply to the events it recommended, so creating or
+    # deleting a nearby event invalidates it
+    return json.dumps({
+        "lat": round(user_lat, 2) if user_lat is not None else None,
+        "lng": round(user_lng, 2) if user_lng is not None else None,
+        "p": sorted(user_preferences),
+        "e": [event['id'] for event in nearby_events]
+    })
+
+def chat_cache_key(user_message, context_key):
+    """Exact-match cache key for a normalized message in a given context"""
+    payload = json.dumps({"m": user_message.lower().strip(), "c": context_key})
+    return "chat:" + hashlib.sha256(payload.encode()).hexdigest()
+
+async def embed_message(user_message):
+    """Return a unit-length embedding for the message, or None if unavailable"""
+    if not CHAT_CACHE_ENABLED:
+        return None
+    try:
+        embeddings = get_openai_client().with_options(timeout=EMBEDDING_TIMEOUT, max_retries=0).embeddings
+        result = await asyncio.wait_for(
+            embeddings.create(model=EMBEDDING_MODEL, input=user_message.lower().strip()),
+            timeout=EMBEDDING_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning("Embedding failed, skipping semantic cache: %r", e)
+        return None
+    embedding = np.asarray(result.data[0].embedding, dtype=np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+async def get_cached_response(user_message, user_lat, user_lng, user_preferences, nearby_events):
+    """Look up a cached reply; returns (response or None, message embedding)"""
+    if not CHAT_CACHE_ENABLED:
+        return None, None
+    context_key = chat_cache_context(user_lat, user_lng, user_preferences, nearby_events)
+
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(chat_cache_key(user_message, context_key))
+            if cached is not None:
+                return cached, None
+        except Exception as e:
+            logger.warning("Redis cache lookup failed: %s", e)
+
+    # Only pay for an embedding once the cheap exact lookup has missed; the caller
+    # reuses it to store the fresh reply
+    embedding = await embed_message(user_message)
+    if embedding is None:
+        return None, None
+
+    now = time.monotonic()
+    best_score, best_response = 0.0, None
+    for entry_context, entry_embedding, entry_response, expires_at in semantic_cache:
+        if entry_context != context_key or expires_at < now:
+            continue
+        score = float(np.dot(embedding, entry_embedding))
+        if score > best_score:
+            best_score, best_response = score, entry_response
+
+    if best_score >= SEMANTIC_CACHE_THRESHOLD:
+        return best_response, embedding
+    return None, embedding
+
+async def cache_response(user_message, user_lat, user_lng, user_preferences, nearby_events, response, embedding):
+    """Store a fresh LLM reply in both cache layers"""
+    if not CHAT_CACHE_ENABLED:
+        return
+    context_key = chat_cache_context(user_lat, user_lng, user_preferences, nearby_events)
+
+    if redis_client is not None:
+        try:
+            await redis_client.setex(chat_cache_key(user_message, context_key), CHAT_CACHE_TTL, response)
+        except Exception as e:
+            logger.warning("Redis cache store failed: %s", e)
+
+    if embedding is not None:
+        semantic_cache.append((context_key, embedding, response, time.monotonic() + CHAT_CACHE_TTL))
+
+CHAT_MODEL = "gpt-4o-mini"
+CHAT_RADIUS_KM = 15.0
+# Replies are asked to stay under 80 words; this is the hard ceiling
+CHAT_MAX_TOKENS = int(os.environ.get('CHAT_MAX_TOKENS', 200))
+# Routes requests sharing STATIC_SYSTEM_PROMPT to the same OpenAI prompt cache shard
+PROMPT_CACHE_KEY = "hlocal_v1"
+
+def build_events_block(nearby_events):
+    """Serialize nearby events as compact JSON with short keys to save input tokens"""
+    events = [
+        {
+            "t": event['title'],
+            "c": event['category'],
+            "d": f"{event['date']} {event['time']}",
+            "v": event['location'],
+            "km": event['distance'],
+            "p": event['price']
+        }
+        for event in nearby_events[:10]  # Limit to top 10 events
+    ]
+    return json.dumps({"events": events}, separators=(",", ":"), ensure_ascii=False)
+
+def build_chat_question(user_message, user_lat, user_lng, user_preferences):
+    """Build the user's request summary"""
+    return f"""User's message: {user_message}
+User's location: {"Provided" if user_lat and user_lng else "Not provided"}
+User's preferences: {', '.join(user_preferences) if user_preferences else "Not specified"}"""
+
+def build_chat_messages(user_message, user_lat, user_lng, user_preferences, nearby_events):
+    """Static system prompt first, then the events block, then the question"""
+    return [
+        {"role": "system", "content": STATIC_SYSTEM_PROMPT},
+        {"role": "user", "content": build_events_block(nearby_events)},
+        {"role": "user", "content": build_chat_question(user_message, user_lat, user_lng, user_preferences)}
+    ]
+
+async def generate_chat_response(user_message, user_lat, user_lng, user_preferences, nearby_events):
+    """Ask the LLM for a reply grounded in the user's nearby events"""
+    completion = await get_openai_client().chat.completions.create(
+        model=CHAT_MODEL,
+        messages=build_chat_messages(user_message, user_lat, user_lng, user_preferences, nearby_events),
+        max_tokens=CHAT_MAX_TOKENS,
+        temperature=CHAT_TEMPERATURE,
+        extra_body={"prompt_cache_key": PROMPT_CACHE_KEY}
+    )
+    return completion.choices[0].message.content
+
+async def stream_chat_response(user_message, user_lat, user_lng, user_preferences, nearby_events):
+    """Yield reply tokens from the LLM as they are generated"""
+    stream = await get_openai_client().chat.completions.create(
+        model=CHAT_MODEL,
+        messages=build_chat_messages(user_message, user_lat, user_lng, user_preferences, nearby_events),
+        max_tokens=CHAT_MAX_TOKENS,
+        temperature=CHAT_TEMPERATURE,
+        stream=True,
+        extra_body={"prompt_cache_key": PROMPT_CACHE_KEY}
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+@dataclass
+class ChatTurn:
+    """Everything both chat endpoints need before and after asking the LLM"""
+    message: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    preferences: List[str]
+    nearby_events: List[dict]
+    cached_response: Optional[str]
+    embedding: Optional[np.ndarray]
+
+async def prepare_chat(chat_request):
+    """Resolve nearby events and any cached reply for a chat request"""
+    user_message = chat_request.message
+    user_lat = chat_request.latitude
+    user_lng = chat_request.longitude
+    user_preferences = chat_request.preferences or []
+
+    # Get nearby events if location provided
+    nearby_events = []
+    if user_lat and user_lng:
+        nearby_events = await find_nearby_events(user_lat, user_lng, CHAT_RADIUS_KM, limit=10)
+
+    # Serve repeated questions from the response cache
+    cached, embedding = await get_cached_response(user_message, user_lat, user_lng, user_preferences, nearby_events)
+    return ChatTurn(user_message, user_lat, user_lng, user_preferences, nearby_events, cached, embedding)
+
+def finish_chat(turn, response):
+    """Cache a fresh reply and log the exchange, both in the background"""
+    if turn.cached_response is None:
+        run_in_background(
+            cache_response(turn.message, turn.latitude, turn.longitude, turn.preferences,
+                           turn.nearby_events, response, turn.embedding),
+            name="cache_chat_response"
+        )
+    log_chat(turn.message, response, turn.latitude, turn.longitude, turn.preferences, turn.nearby_events)
+
+def log_chat(user_message, response, user_lat, user_lng, user_preferences, nearby_events):
+    """Store the exchange without making the user wait on the write"""
+    chat_data = {
+        "id": str(uuid.uuid4()),
+        "user_message": user_message,
+        "bot_response": response,
+        "latitude": user_lat,
+        "longitude": user_lng,
+        "preferences": user_preferences,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "recommended_events": [event['id'] for event in nearby_events[:5]]
+    }
+    run_in_background(chats_collection.insert_one(chat_data), name="log_chat")
+
+def sse_event(data, event=None):
+    """Format one server-sent event; data is JSON-encoded so newlines stay intact"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @app.post("/api/chat")
 async def chat_with_bot(chat_request: ChatMessage):
     try:
-        user_message = chat_request.message
-        user_lat = chat_request.latitude
-        user_lng = chat_request.longitude
-        user_preferences = chat_request.preferences or []
-        
-        # Get nearby events if location provided
-        nearby_events = []
-        if user_lat and user_lng:
-            events = list(events_collection.find({}, {"_id": 0}))
-            for event in events:
-                distance = calculate_distance(user_lat, user_lng, event['latitude'], event['longitude'])
-                if distance <= 15.0:  # 15km radius
-                    event['distance'] = round(distance, 2)
-                    nearby_events.append(event)
-            nearby_events.sort(key=lambda x: x['distance'])
-        
-        # Prepare context for LLM
-        context = f"""
-        You are a helpful hyperlocal events assistant. Help users discover local events based on their location and preferences.
-        
-        User's message: {user_message}
-        User's location: {"Provided" if user_lat and user_lng else "Not provided"}
-        User's preferences: {', '.join(user_preferences) if user_preferences else "Not specified"}
-        
-        Available nearby events:
-        """
-        
-        for event in nearby_events[:10]:  # Limit to top 10 events
-            context += f"""
-            - {event['title']} ({event['category']})
-              Date: {event['date']} at {event['time']}
-              Location: {event['location']} ({event['distance']}km away)
-              Description: {event['description']}
-              Price: {event['price']}
-            """
-        
-        context += """
-        
-        Provide helpful, friendly responses about local events. If the user asks about events:
-        1. Recommend relevant events based on their preferences and location
-        2. Provide brief, engaging descriptions
-        3. Mention practical details like distance, date, and price
-        4. Ask follow-up questions to better understand their interests
-        
-        If no location is provided, politely ask for their location to provide better recommendations.
-        Keep responses conversational and helpful.
-        """
-        
-        # Initialize LLM chat
-        chat = LlmChat(
-            api_key=OPENAI_API_KEY,
-            session_id=f"chat_{uuid.uuid4()}",
-            system_message=context
-        ).with_model("openai", "gpt-4o-mini")
-        
-        # Send message to LLM
-        llm_message = UserMessage(text=user_message)
-        response = await chat.send_message(llm_message)
-        
-        # Store chat message
-        chat_data = {
-            "id": str(uuid.uuid4()),
-            "user_message": user_message,
-            "bot_response": response,
-            "latitude": user_lat,
-            "longitude": user_lng,
-            "preferences": user_preferences,
-            "timestamp": datetime.now().isoformat(),
-            "recommended_events": [event['id'] for event in nearby_events[:5]]
-        }
-        chats_collection.insert_one(chat_data)
+        turn = await prepare_chat(chat_request)
+        response = turn.cached_response
+        if response is None:
+            response = await generate_chat_response(
+                turn.message, turn.latitude, turn.longitude, turn.preferences, turn.nearby_events
+            )
+        finish_chat(turn, response)
         
         return ChatResponse(
             response=response,
-            recommended_events=nearby_events[:5]  # Return top 5 events
+            recommended_events=turn.nearby_events[:5]  # Return top 5 events
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def stream_chat_with_bot(chat_request: ChatMessage):
+    """Stream the chat reply as SSE: an "events" event, reply chunks, then a "done" event"""
+    try:
+        turn = await prepare_chat(chat_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+
+    async def event_gen():
+        yield sse_event(turn.nearby_events[:5], event="events")
+
+        if turn.cached_response is not None:
+            yield sse_event(turn.cached_response)
+            yield sse_event("[DONE]", event="done")
+            finish_chat(turn, turn.cached_response)
+            return
+
+        parts = []
+        try:
+            async for token in stream_chat_response(
+                turn.message, turn.latitude, turn.longitude, turn.preferences, turn.nearby_events
+            ):
+                parts.append(token)
+                yield sse_event(token)
+        except Exception as e:
+            logger.error("Chat stream failed: %s", e)
+            yield sse_event(f"Chat error: {str(e)}", event="error")
+            return
+        yield sse_event("[DONE]", event="done")
+
+        finish_chat(turn, "".join(parts))
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
+
 @app.delete("/api/events/{event_id}")
 async def delete_event(event_id: str):
     try:
-        result = events_collection.delete_one({"id": event_id})
+        result = await events_collection.delete_one({"id": event_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Event not found")
+        mark_events_changed()
         return {"message": "Event deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -217,10 +602,9 @@ async def delete_event(event_id: str):
 @app.on_event("startup")
 async def create_sample_events():
     """Create sample events if none exist"""
-    if events_collection.count_documents({}) == 0:
+    if await events_collection.count_documents({}) == 0:
         sample_events = [
             {
-                "id": str(uuid.uuid4()),
                 "title": "Downtown Jazz Night",
                 "description": "Live jazz music featuring local artists in the heart of downtown",
                 "category": "Music",
@@ -232,11 +616,9 @@ async def create_sample_events():
                 "longitude": -73.9851,
                 "organizer": "Blue Note Entertainment",
                 "price": "$15",
-                "image_url": "https://images.unsplash.com/photo-1493225457124-a3eb161ffa5f",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1493225457124-a3eb161ffa5f"
             },
             {
-                "id": str(uuid.uuid4()),
                 "title": "Community Farmers Market",
                 "description": "Fresh local produce, artisanal foods, and handmade crafts",
                 "category": "Food & Drink",
@@ -248,11 +630,9 @@ async def create_sample_events():
                 "longitude": -73.9934,
                 "organizer": "Riverside Community Association",
                 "price": "Free",
-                "image_url": "https://images.unsplash.com/photo-1488459716781-31db52582fe9",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1488459716781-31db52582fe9"
             },
             {
-                "id": str(uuid.uuid4()),
                 "title": "Tech Startup Networking",
                 "description": "Connect with local entrepreneurs and tech professionals",
                 "category": "Business & Networking",
@@ -264,11 +644,9 @@ async def create_sample_events():
                 "longitude": -73.9776,
                 "organizer": "TechConnect NYC",
                 "price": "$25",
-                "image_url": "https://images.unsplash.com/photo-1515169067868-5387ec356754",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1515169067868-5387ec356754"
             },
             {
-                "id": str(uuid.uuid4()),
                 "title": "Morning Yoga in the Park",
                 "description": "Start your day with mindful movement and meditation",
                 "category": "Health & Wellness",
@@ -280,11 +658,9 @@ async def create_sample_events():
                 "longitude": -73.9895,
                 "organizer": "Zen Wellness Studio",
                 "price": "$20",
-                "image_url": "https://images.unsplash.com/photo-1506629905189-51508327e5ce",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1506629905189-51508327e5ce"
             },
             {
-                "id": str(uuid.uuid4()),
                 "title": "Local Art Gallery Opening",
                 "description": "Featuring works by emerging local artists",
                 "category": "Arts & Culture",
@@ -296,11 +672,9 @@ async def create_sample_events():
                 "longitude": -73.9845,
                 "organizer": "Metro Arts Collective",
                 "price": "Free",
-                "image_url": "https://images.unsplash.com/photo-1460661419201-fd4cecdf8a8b",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1460661419201-fd4cecdf8a8b"
             },
             {
-                "id": str(uuid.uuid4()),
                 "title": "Family Fun Run",
                 "description": "3K fun run for families with kids activities",
                 "category": "Sports & Fitness",
@@ -312,14 +686,91 @@ async def create_sample_events():
                 "longitude": -73.9712,
                 "organizer": "Riverside Running Club",
                 "price": "$10",
-                "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b",
-                "created_at": datetime.now().isoformat()
+                "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b"
+            }
+        ]
+        
+        # One timestamp and one batch of ids for the whole seed set
+        now_iso = datetime.now(timezone.utc).isoformat()
+        event_ids = [str(uuid.uuid4()) for _ in sample_events]
+        sample_events = [
+            {
+                "id": event_id,
+                **event,
+                "created_at": now_iso,
+                "location_geo": to_geo_point(event["latitude"], event["longitude"])
             }
+            for event_id, event in zip(event_ids, sample_events)
         ]
         
-        events_collection.insert_many(sample_events)
+        await events_collection.insert_many(sample_events)
         print("Sample events created successfully")
 
+@app.on_event("startup")
+async def migrate_event_locations():
+    """Backfill GeoJSON locations for events created before the 2dsphere index"""
+    # Only valid coordinates can be indexed; anything else would make the 2dsphere
+    # index build fail and stop the app from booting
+    valid_coordinates = {
+        "latitude": {"$gte": -90, "$lte": 90},
+        "longitude": {"$gte": -180, "$lte": 180}
+    }
+    result = await events_collection.update_many(
+        {"location_geo": {"$exists": False}, **valid_coordinates},
+        [{"$set": {"location_geo": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+    )
+    if result.modified_count:
+        logger.info("Backfilled location_geo for %d events", result.modified_count)
+
+    skipped = await events_collection.count_documents(
+        {"location_geo": {"$exists": False}, "$nor": [valid_coordinates]}
+    )
+    if skipped:
+        logger.warning("Skipped location_geo backfill for %d events with invalid coordinates", skipped)
+
+@app.on_event("startup")
+async def create_indexes():
+    """Ensure indexes for every field the API filters or sorts on"""
+    await events_collection.create_index("id", unique=True)
+    await events_collection.create_index([("created_at", ASCENDING), ("id", ASCENDING)])
+    try:
+        await events_collection.create_index([("location_geo", GEOSPHERE)])
+    except Exception as e:
+        # Nearby lookups are served from the in-process snapshot, so keep booting
+        logger.error("Could not build the location_geo 2dsphere index: %s", e)
+    await chats_collection.create_index("id")
+    await chats_collection.create_index([("timestamp", DESCENDING)])
+
+@app.on_event("startup")
+async def start_events_snapshot():
+    """Load the in-process events snapshot and keep it fresh"""
+    run_in_background(refresh_snapshot_periodically(), name="events_snapshot")
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Stop background work, then release pooled connections to OpenAI, Redis and MongoDB"""
+    # Snapshot refreshes are reads and can simply stop
+    snapshot_tasks = [task for task in background_tasks if task.get_name() in SNAPSHOT_TASK_NAMES]
+    for task in snapshot_tasks:
+        task.cancel()
+    await asyncio.gather(*snapshot_tasks, return_exceptions=True)
+
+    # Give pending writes (chat logs, cache entries) a bounded chance to land
+    pending = list(background_tasks)
+    if pending:
+        _, still_pending = await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_PERIOD)
+        if still_pending:
+            logger.warning("Dropping %d background writes still pending at shutdown", len(still_pending))
+            for task in still_pending:
+                task.cancel()
+            await asyncio.gather(*still_pending, return_exceptions=True)
+
+    if _openai_client is not None:
+        await _openai_client.close()
+    if redis_client is not None:
+        await redis_client.close()
+    client.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -9,23 +9,20 @@ class HyperlocalEventsAPITester:
         self.tests_run = 0
         self.tests_passed = 0
         self.created_event_id = None
+        # One keep-alive session so tests reuse the TCP/TLS connection
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
 
     def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
         """Run a single API test"""
         url = f"{self.base_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
 
         self.tests_run += 1
         print(f"\n🔍 Testing {name}...")
         print(f"   URL: {url}")
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers)
+            response = self.session.request(method, url, json=data, params=params)
 
             success = response.status_code == expected_status
             if success:
@@ -55,12 +52,18 @@ class HyperlocalEventsAPITester:
         return self.run_test("Health Check", "GET", "api/health", 200)
 
     def test_get_events(self):
-        """Test getting all events"""
-        success, response = self.run_test("Get All Events", "GET", "api/events", 200)
-        if success and isinstance(response, list):
-            print(f"   Found {len(response)} events")
-            if len(response) > 0:
-                print(f"   Sample event: {response[0].get('title', 'No title')}")
+        """Test getting events (paginated: returns {items, next_cursor}; pass next_cursor as ?after=)"""
+        success, response = self.run_test("Get All Events", "GET", "api/events", 200, params={'limit': 50})
+        if success and isinstance(response, dict):
+            items = response.get('items', [])
+            print(f"   Found {len(items)} events on the first page")
+            if len(items) > 0:
+                print(f"   Sample event: {items[0].get('title', 'No title')}")
+            if response.get('next_cursor'):
+                success, next_page = self.run_test("Get Next Events Page", "GET", "api/events", 200,
+                                                   params={'limit': 50, 'after': response['next_cursor']})
+                if success:
+                    print(f"   Found {len(next_page.get('items', []))} events on the next page")
         return success
 
     def test_create_event(self):
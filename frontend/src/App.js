@@ -16,6 +16,8 @@ function App() {
   const [inputMessage, setInputMessage] = useState('');
   const [userLocation, setUserLocation] = useState(null);
   const [events, setEvents] = useState([]);
+  const [eventsCursor, setEventsCursor] = useState(null);
+  const [isLoadingEvents, setIsLoadingEvents] = useState(false);
   const [recommendedEvents, setRecommendedEvents] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
   const [activeTab, setActiveTab] = useState('chat');
@@ -92,13 +94,21 @@ function App() {
     }
   };
 
-  const fetchEvents = async () => {
+  // /api/events is paginated newest first: load the first page, then more on demand
+  const fetchEvents = async (after = null) => {
+    setIsLoadingEvents(true);
     try {
-      const response = await fetch(`${BACKEND_URL}/api/events`);
+      const params = new URLSearchParams({ limit: '50' });
+      if (after) params.set('after', after);
+      const response = await fetch(`${BACKEND_URL}/api/events?${params}`);
       const data = await response.json();
-      setEvents(data);
+      const items = data.items || [];
+      setEvents(prev => (after ? [...prev, ...items] : items));
+      setEventsCursor(data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching events:', error);
+    } finally {
+      setIsLoadingEvents(false);
     }
   };
 
@@ -117,7 +127,7 @@ function App() {
     setIsLoading(true);
 
     try {
-      const response = await fetch(`${BACKEND_URL}/api/chat`, {
+      const response = await fetch(`${BACKEND_URL}/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -134,17 +144,61 @@ function App() {
         throw new Error('Failed to get response');
       }
 
-      const data = await response.json();
-
-      const botMessage = {
-        id: Date.now() + 1,
-        type: 'bot',
-        content: data.response,
-        timestamp: new Date().toLocaleTimeString()
+      // Show the reply as it streams in (server-sent events)
+      const botMessageId = Date.now() + 1;
+      let botContent = '';
+      const appendToBotMessage = (text) => {
+        const isFirstChunk = !botContent;
+        const content = botContent + text;
+        botContent = content;
+        if (isFirstChunk) {
+          setIsLoading(false);
+          setMessages(prev => [...prev, {
+            id: botMessageId,
+            type: 'bot',
+            content,
+            timestamp: new Date().toLocaleTimeString()
+          }]);
+        } else {
+          setMessages(prev => prev.map(message =>
+            message.id === botMessageId ? { ...message, content } : message
+          ));
+        }
       };
 
-      setMessages(prev => [...prev, botMessage]);
-      setRecommendedEvents(data.recommended_events || []);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let done = false;
+
+      while (!done) {
+        const chunk = await reader.read();
+        if (chunk.done) break;
+        buffer += decoder.decode(chunk.value, { stream: true });
+
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+          let eventType = 'message';
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event: ')) eventType = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          }
+          if (!data) continue;
+
+          const payload = JSON.parse(data);
+          if (eventType === 'events') {
+            setRecommendedEvents(payload || []);
+          } else if (eventType === 'error') {
+            throw new Error(payload);
+          } else if (eventType === 'done') {
+            done = true;
+          } else {
+            appendToBotMessage(payload);
+          }
+        }
+      }
 
     } catch (error) {
       console.error('Error sending message:', error);
@@ -443,6 +497,17 @@ function App() {
                 </CardContent>
               </Card>
             ))}
+            {eventsCursor && (
+              <div className="col-span-full flex justify-center">
+                <Button
+                  variant="outline"
+                  onClick={() => fetchEvents(eventsCursor)}
+                  disabled={isLoadingEvents}
+                >
+                  {isLoadingEvents ? 'Loading...' : 'Load more events'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
 
@@ -583,7 +648,7 @@ function App() {
                   Use the admin panel to add new local events. Events will be automatically available for recommendations based on user location and preferences.
                 </p>
                 <div className="space-y-2">
-                  <h4 className="font-medium">Current Events: {events.length}</h4>
+                  <h4 className="font-medium">Current Events: {events.length}{eventsCursor ? '+' : ''}</h4>
                   <p className="text-sm text-slate-600">
                     Events are automatically filtered by location when users chat with the assistant.
                   </p>
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+np = pytest.importorskip("numpy")
+
+import geo  # noqa: E402
+
+
+def test_equirect_wraps_across_antimeridian():
+    assert geo._equirect_km(0.0, 179.99, 0.0, -179.99) == pytest.approx(2.22, abs=0.01)
+
+
+def test_distance_from_matches_known_distance():
+    # Downtown Jazz Night to Community Farmers Market in the sample data
+    dist_from = geo.make_distance_from(40.7589, -73.9851)
+    assert float(dist_from(40.7505, -73.9934)) == pytest.approx(1.17, abs=0.01)
+
+
+def test_rank_nearby_finds_events_across_antimeridian(monkeypatch):
+    monkeypatch.setattr(geo, "NUMBA_MIN_BATCH", float("inf"))
+    lats = np.array([0.0, 0.0, 10.0])
+    lngs = np.array([-179.99, 179.0, -179.99])
+    indices, distances = geo.rank_nearby(0.0, 179.99, 10.0, lats, lngs)
+    assert list(indices) == [0]
+    assert distances[0] == pytest.approx(2.22, abs=0.01)
+
+
+def test_rank_nearby_sorts_and_limits(monkeypatch):
+    monkeypatch.setattr(geo, "NUMBA_MIN_BATCH", float("inf"))
+    lats = np.array([40.76, 40.7589, 40.80, 40.75])
+    lngs = np.array([-73.98, -73.9851, -73.90, -73.99])
+    indices, distances = geo.rank_nearby(40.7589, -73.9851, 5.0, lats, lngs, limit=2)
+    assert list(indices) == [1, 0]
+    assert list(distances) == sorted(distances)
+
+
+def sample_points(count=2000, seed=7):
+    """Points around NYC plus a cluster straddling the antimeridian"""
+    rng = np.random.default_rng(seed)
+    half = count // 2
+    lats = np.concatenate([40.75 + rng.uniform(-0.2, 0.2, half), rng.uniform(-0.1, 0.1, half)])
+    lngs = np.concatenate([
+        -73.98 + rng.uniform(-0.2, 0.2, half),
+        rng.choice([179.95, -179.95], half) + rng.uniform(-0.04, 0.04, half)
+    ])
+    return lats.astype(np.float64), lngs.astype(np.float64)
+
+
+@pytest.mark.skipif(geo.haversine_batch is None, reason="numba not installed")
+@pytest.mark.parametrize("origin", [(40.7589, -73.9851), (0.0, 179.99), (0.05, -179.97)])
+def test_rank_nearby_numba_and_numpy_branches_agree(monkeypatch, origin):
+    lats, lngs = sample_points()
+    lat, lng = origin
+
+    monkeypatch.setattr(geo, "NUMBA_MIN_BATCH", float("inf"))
+    numpy_indices, numpy_distances = geo.rank_nearby(lat, lng, 10.0, lats, lngs, limit=50)
+
+    monkeypatch.setattr(geo, "NUMBA_MIN_BATCH", 0)
+    numba_indices, numba_distances = geo.rank_nearby(lat, lng, 10.0, lats, lngs, limit=50)
+
+    assert len(numpy_indices) > 0
+    np.testing.assert_array_equal(numpy_indices, numba_indices)
+    np.testing.assert_allclose(numpy_distances, numba_distances, rtol=1e-9)
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from pagination import EVENTS_ORDER, encode_events_cursor, events_after_cursor  # noqa: E402
+
+
+def matches(doc, query):
+    """Evaluate the subset of MongoDB query syntax the cursor queries use"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                assert op == "$lt", op
+                # Comparison operators only match values of the same type
+                if not isinstance(value, str) or not value < operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def sort_key(doc):
+    """MongoDB sort key for EVENTS_ORDER: missing created_at sorts below any string"""
+    assert EVENTS_ORDER == [("created_at", -1), ("id", -1)]
+    created_at = doc.get("created_at")
+    return (created_at is not None, created_at or "", doc["id"])
+
+
+def paginate(docs, limit):
+    ordered = sorted(docs, key=sort_key, reverse=True)
+    pages, cursor = [], None
+    while True:
+        remaining = [doc for doc in ordered if cursor is None or matches(doc, events_after_cursor(cursor))]
+        page = remaining[:limit]
+        pages.append(page)
+        if len(page) < limit:
+            return ordered, pages
+        cursor = encode_events_cursor(page[-1])
+
+
+@pytest.fixture
+def events():
+    docs = [{"id": f"id-{i:02d}", "created_at": f"2025-01-{10 + i % 4:02d}T00:00:00+00:00"} for i in range(12)]
+    # Out-of-band documents without a timestamp
+    docs += [{"id": "id-90"}, {"id": "id-91"}, {"id": "id-92"}]
+    return docs
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 50])
+def test_cursor_round_trip_visits_every_event_once(events, limit):
+    ordered, pages = paginate(events, limit)
+    assert [doc for page in pages for doc in page] == ordered
+
+
+def test_newest_events_come_first(events):
+    ordered, pages = paginate(events, 3)
+    assert pages[0][0]["created_at"] == max(doc["created_at"] for doc in events if "created_at" in doc)
+    assert all("created_at" not in doc for doc in ordered[-3:])
+
+
+def test_cursor_for_event_without_created_at():
+    cursor = encode_events_cursor({"id": "id-91"})
+    assert events_after_cursor(cursor) == {"created_at": None, "id": {"$lt": "id-91"}}
+
+
+@pytest.mark.parametrize("cursor", ["", "no-separator", "2025-01-10T00:00:00|"])
+def test_invalid_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        events_after_cursor(cursor)